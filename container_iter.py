@@ -1,45 +1,274 @@
-from libstdcxx.v6.printers import find_type, lookup_node_type, get_value_from_list_node, RbtreeIterator, get_value_from_Rb_tree_node
-from typing import Callable, Union, Any
-import gdb
+from libstdcxx.v6.printers import lookup_node_type, get_value_from_list_node, get_value_from_Rb_tree_node
+from typing import Callable, Iterator, Union
+from collections import OrderedDict
+import struct
 import re
+import gdb
 
 handler = Callable[[gdb.Value], bool]
+error_handler = Callable[[str], None]
+
+# node types keyed by (kind, container type name), stale once a new objfile is loaded
+_NODE_TYPE_CACHE: dict[tuple[str, str], gdb.Type] = {}
+# (bytes to read, field offset, struct format of pointer) keyed by (node type name, field)
+_NODE_LAYOUT_CACHE: dict[tuple[str, str], tuple[int, int, str]] = {}
+
+# (inferior number, pc, identifier) known to have no symbol, symbols may appear once a new objfile is loaded
+#   without ASLR different PIE programs share a load base, pc alone does not tell them apart
+_MISSING_SYMBOLS: set[tuple[int, int, str]] = set()
+
+def _clear_type_caches(event: gdb.NewObjFileEvent) -> None:
+    _NODE_TYPE_CACHE.clear()
+    _NODE_LAYOUT_CACHE.clear()
+    _MISSING_SYMBOLS.clear()
+gdb.events.new_objfile.connect(_clear_type_caches)
 
-def get_val(expression: str, name: str) -> gdb.Value:
+def _cached_node_type(kind: str, container_type: gdb.Type, type_name: str) -> gdb.Type:
+    key = (kind, type_name)
+    node_type = _NODE_TYPE_CACHE.get(key)
+    if node_type == None:
+        node_type = lookup_node_type(kind, container_type).pointer()
+        _NODE_TYPE_CACHE[key] = node_type
+    return node_type
+
+# evaluated expressions keyed by (expression, pc, frame level, thread)
+#   level tells apart recursive frames returning to the same call site
+#   values are invalidated once inferior runs, or memory & registers are edited (e.g. "set var")
+_EVAL_CACHE: dict[tuple[str, int, int, int], gdb.Value] = {}
+gdb.events.cont.connect(lambda e: _EVAL_CACHE.clear())
+gdb.events.stop.connect(lambda e: _EVAL_CACHE.clear())
+gdb.events.memory_changed.connect(lambda e: _EVAL_CACHE.clear())
+gdb.events.register_changed.connect(lambda e: _EVAL_CACHE.clear())
+
+def _cached_eval(expression: str) -> gdb.Value:
+    # convenience variables (e.g. "set $l = other_list") change without any of those events
+    if '$' in expression:
+        return gdb.parse_and_eval(expression)
     try:
-        val = gdb.parse_and_eval(expression)
+        frame = gdb.selected_frame()
+        key = (expression, frame.pc(), frame.level(), gdb.selected_thread().ptid[1])
     except gdb.error:
-        print(f'Error: undefined {name} expression {expression}.')
-        val = None
-    if val != None and name not in val.type.tag:
-        print(f'Error: expression {expression} is not a {name}.')
-        val = None
+        # no frame selected, e.g. inferior not started
+        return gdb.parse_and_eval(expression)
+    val = _EVAL_CACHE.get(key)
+    if val == None:
+        val = gdb.parse_and_eval(expression)
+        _EVAL_CACHE[key] = val
     return val
 
-def list_iter(list_expr: str, func: handler) -> None:
-    list_val = get_val(list_expr, 'list')
-    if not list_val:
-        return
+# raw bytes of recently read nodes keyed by (inferior number, address, size), dropped once inferior runs or memory is edited
+#   switching inferior fires none of these events, and without ASLR instances of a program share heap addresses
+_NODE_BLOB_CACHE: OrderedDict[tuple[int, int, int], memoryview] = OrderedDict()
+_NODE_BLOB_CACHE_SIZE = 4096
+gdb.events.cont.connect(lambda e: _NODE_BLOB_CACHE.clear())
+gdb.events.stop.connect(lambda e: _NODE_BLOB_CACHE.clear())
+gdb.events.memory_changed.connect(lambda e: _NODE_BLOB_CACHE.clear())
+
+# bare identifiers are checked by a hashed symbol lookup, parse_and_eval() scans symbol tables before raising
+def _symbol_missing(expression: str) -> bool:
+    if not expression.isidentifier():
+        return False
+    try:
+        key = (gdb.selected_inferior().num, gdb.selected_frame().pc(), expression)
+        if key in _MISSING_SYMBOLS:
+            return True
+        sym, is_field = gdb.lookup_symbol(expression)
+    except gdb.error:
+        return False
+    if sym == None and not is_field:
+        _MISSING_SYMBOLS.add(key)
+        return True
+    return False
+
+def _field_offset(t: gdb.Type, name: str) -> int:
+    for f in t.fields():
+        if f.name == name:
+            return f.bitpos // 8
+        if f.is_base_class:
+            offset = _field_offset(f.type, name)
+            if offset != None:
+                return f.bitpos // 8 + offset
+    return None
+
+def _node_layout(node_type: gdb.Type, field: str) -> tuple[int, int, str]:
+    key = (str(node_type), field)
+    layout = _NODE_LAYOUT_CACHE.get(key)
+    if layout == None:
+        ptr_size = node_type.sizeof
+        offset = _field_offset(node_type.target(), field)
+        endian = '<' if 'little' in gdb.execute('show endian', False, True) else '>'
+        layout = (offset + ptr_size, offset, endian + ('Q' if ptr_size == 8 else 'I'))
+        _NODE_LAYOUT_CACHE[key] = layout
+    return layout
+
+def _read_node(inferior: gdb.Inferior, addr: int, size: int) -> memoryview:
+    key = (inferior.num, addr, size)
+    blob = _NODE_BLOB_CACHE.get(key)
+    if blob == None:
+        blob = inferior.read_memory(addr, size)
+        _NODE_BLOB_CACHE[key] = blob
+        if len(_NODE_BLOB_CACHE) > _NODE_BLOB_CACHE_SIZE:
+            _NODE_BLOB_CACHE.popitem(last=False)
+    else:
+        _NODE_BLOB_CACHE.move_to_end(key)
+    return blob
+
+# type tags of containers, with optional versioned, cxx11 abi or debug mode namespace
+_CONTAINER_TAG_RES = {
+    'list': re.compile(r'^std::(__\d+::)?(__cxx11::|__debug::)?list<'),
+    'map': re.compile(r'^std::(__\d+::)?(__cxx11::|__debug::)?map<')
+}
 
-    node_type = lookup_node_type('_List_node', list_val.type).pointer()
-    head = list_val['_M_impl']['_M_node'].address
-    node = head.dereference()['_M_next']
+# return the value with its type name, which also keys the node type cache
+def _get_container(expression: str, name: str, on_error: error_handler) -> tuple[gdb.Value, str]:
+    try:
+        if _symbol_missing(expression):
+            raise gdb.error(f'No symbol "{expression}" in current context.')
+        val = _cached_eval(expression)
+    except gdb.error:
+        on_error(f'Error: undefined {name} expression {expression}.')
+        return None, ''
+    type_name = val.type.strip_typedefs().tag or ''
+    if _CONTAINER_TAG_RES[name].match(type_name) == None:
+        on_error(f'Error: expression {expression} is not a {name}.')
+        return None, ''
+    return val, type_name
+
+def get_val(expression: str, name: str, on_error: error_handler = print) -> gdb.Value:
+    return _get_container(expression, name, on_error)[0]
+
+# corrupted links (e.g. inspecting a crashed process) may form a cycle, stop after visiting MAX_NODES nodes
+#   set DETECT_CYCLES to also track visited addresses and stop at the first revisit, at the cost of a set
+MAX_NODES = 1 << 20
+DETECT_CYCLES = False
+
+def _corrupted(expression: str, cause: str, on_error: error_handler) -> None:
+    on_error(f'Warning: stop iterating {expression}, {cause}, container may be corrupted.')
+
+def _list_nodes(list_val: gdb.Value, type_name: str, limit: int | None, expression: str, on_error: error_handler) -> Iterator[gdb.Value]:
+    node_type = _cached_node_type('_List_node', list_val.type, type_name)
+    read_size, next_offset, ptr_format = _node_layout(node_type, '_M_next')
+    head = int(list_val['_M_impl']['_M_node'].address)
+    addr = int(list_val['_M_impl']['_M_node']['_M_next'])
+
+    # loop invariants bound to locals
+    to_value = gdb.Value
+    read_node = _read_node
+    inferior = gdb.selected_inferior()
+    unpack = struct.Struct(ptr_format).unpack_from
+
+    # only the link pointer is decoded from raw bytes, node stays a lazy lvalue
+    #   since get_value_from_list_node() needs the address of node's storage
+    seen = set() if DETECT_CYCLES else None
+    count = 0
+    while addr != head:
+        if count == limit:
+            return
+        if count == MAX_NODES:
+            _corrupted(expression, f'more than {MAX_NODES} nodes', on_error)
+            return
+        if seen != None:
+            if addr in seen:
+                _corrupted(expression, f'node 0x{addr:x} visited twice', on_error)
+                return
+            seen.add(addr)
+        count += 1
+        yield to_value(addr).cast(node_type).dereference()
+        addr = unpack(read_node(inferior, addr, read_size), next_offset)[0]
+
+def _map_nodes(map_val: gdb.Value, type_name: str, limit: int | None, expression: str, on_error: error_handler) -> Iterator[gdb.Value]:
+    node_type = _cached_node_type('_Rb_tree_node', map_val.type, type_name)
+    _, left_offset, ptr_format = _node_layout(node_type, '_M_left')
+    read_size, right_offset, _ = _node_layout(node_type, '_M_right')
+    addr = int(map_val['_M_t']['_M_impl']['_M_header']['_M_parent'])   # root
 
-    while node != head:
-        node = node.cast(node_type).dereference()
-        if func(get_value_from_list_node(node)):
+    to_value = gdb.Value
+    read_node = _read_node
+    inferior = gdb.selected_inferior()
+    unpack = struct.Struct(ptr_format).unpack_from
+
+    # in-order walk with an explicit stack of (node, right child), both links decoded from one read
+    seen = set() if DETECT_CYCLES else None
+    stack = []
+    count = 0
+    reads = 0   # a cycle can keep the left spine growing, bound node reads rather than visits
+    while addr or stack:
+        while addr:
+            if reads == MAX_NODES:
+                _corrupted(expression, f'more than {MAX_NODES} nodes', on_error)
+                return
+            if seen != None:
+                if addr in seen:
+                    _corrupted(expression, f'node 0x{addr:x} visited twice', on_error)
+                    return
+                seen.add(addr)
+            reads += 1
+            node = read_node(inferior, addr, read_size)
+            stack.append((addr, unpack(node, right_offset)[0]))
+            addr = unpack(node, left_offset)[0]
+        if count == limit:
+            return
+        count += 1
+        addr, right = stack.pop()
+        yield to_value(addr).cast(node_type).dereference()
+        addr = right
+
+# element passed to func when iterating with "lazy=True"
+#   payload is extracted on first access of "value", predicates on the raw node can skip it
+class LazyNode:
+    def __init__(self, node: gdb.Value, get_value: Callable[[gdb.Value], gdb.Value]):
+        self.node = node
+        self.get_value = get_value
+        self.payload = None
+
+    @property
+    def value(self) -> gdb.Value:
+        if self.payload == None:
+            self.payload = self.get_value(self.node)
+        return self.payload
+
+# kind: (node walker, payload getter)
+_CONTAINER_WALKERS = {
+    'list': (_list_nodes, get_value_from_list_node),
+    'map': (_map_nodes, get_value_from_Rb_tree_node)
+}
+
+def _elements(val: gdb.Value, type_name: str, kind: str, limit: int | None, lazy: bool, expression: str, on_error: error_handler) -> Iterator[Union[gdb.Value, LazyNode]]:
+    walker, get_value = _CONTAINER_WALKERS[kind]
+    nodes = walker(val, type_name, limit, expression, on_error)
+    if lazy:
+        return (LazyNode(node, get_value) for node in nodes)
+    return map(get_value, nodes)
+
+# func returning True still stops iteration first, limit only caps the number of visited elements
+def list_iter(list_expr: str, func: handler, limit: int | None = None, on_error: error_handler = print, lazy: bool = False) -> None:
+    list_val, type_name = _get_container(list_expr, 'list', on_error)
+    if not list_val:
+        return
+    for elem in _elements(list_val, type_name, 'list', limit, lazy, list_expr, on_error):
+        if func(elem):
             break
-        node = node['_M_next']
 
-def map_iter(map_expr: str, func: handler) -> None:
-    map_val = get_val(map_expr, 'map')
+def map_iter(map_expr: str, func: handler, limit: int | None = None, on_error: error_handler = print, lazy: bool = False) -> None:
+    map_val, type_name = _get_container(map_expr, 'map', on_error)
     if not map_val:
         return
+    for elem in _elements(map_val, type_name, 'map', limit, lazy, map_expr, on_error):
+        if func(elem):
+            break
 
-    node_type = lookup_node_type('_Rb_tree_node', map_val.type).pointer()
-    map_iter = RbtreeIterator(map_val)
+# specs are (expression, 'list' | 'map', func), each distinct container is evaluated & walked once
+#   and its elements are dispatched to every func on it, until all of them return True
+def iter_many(specs: list[tuple[str, str, handler]], limit: int | None = None, on_error: error_handler = print, lazy: bool = False) -> None:
+    groups = {}
+    for expression, kind, func in specs:
+        groups.setdefault((expression, kind), []).append(func)
 
-    for pair in map_iter:
-        pair = pair.cast(node_type).dereference()
-        if func(get_value_from_Rb_tree_node(pair)):
-            break
\ No newline at end of file
+    for (expression, kind), funcs in groups.items():
+        val, type_name = _get_container(expression, kind, on_error)
+        if not val:
+            continue
+        for elem in _elements(val, type_name, kind, limit, lazy, expression, on_error):
+            funcs = [func for func in funcs if not func(elem)]
+            if not funcs:
+                break
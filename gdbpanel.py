@@ -1,16 +1,51 @@
 from typing import Callable, Union, Any
+import collections
+import bisect
+import array
 import selectors
+import select
+import functools
+import itertools
 import threading
 import pygments
-import inspect
 import math
-import copy
 import time
 import sys
 import gdb
 import os
 import re
 
+# prefix "   <index>  " of each line printed by "show commands"
+_CMD_PREFIX_RE = re.compile(r'^\s+\d+\s+')
+# foreground colored token in pygments' 256 color output, decoded for every source line
+_ANSI_RE = re.compile(r'\x1b\[38.+?m(.+?)\x1b\[39.*?m')
+# commands recorded by ValueHistory pane
+_PRINT_PREFIXES = ('p ', 'pp ', 'print ', 'panel print ')
+# type tag of std::list, with optional versioned & cxx11 abi namespace
+_LIST_TAG_RE = re.compile(r'^std::(__\d+::)?(__cxx11::)?list<.*>$')
+
+# lines of inferior logs kept by Console.Logger
+LOG_CAPACITY = 512
+
+# pygments formatter & lexers are costly to build, shared by every Source pane
+@functools.lru_cache(maxsize=8)
+def _get_fmter(style: str):
+    from pygments.formatters import Terminal256Formatter
+    return Terminal256Formatter(style=style)
+
+# keyed by file extension, unknown ones (e.g. libstdc++'s <list>) & ".h" are highlighted as c++
+#   keep blank lines at both ends, highlighted segments are mapped back line by line
+@functools.lru_cache(maxsize=16)
+def _get_lexer_for(ext: str):
+    from pygments.lexers import get_lexer_for_filename
+    from pygments.util import ClassNotFound
+    if ext == '.h':
+        ext = '.cpp'
+    try:
+        return get_lexer_for_filename('foo' + ext, stripnl=False)
+    except ClassNotFound:
+        return get_lexer_for_filename('foo.cpp', stripnl=False)
+
 # forward declaration for type hint
 class Panel(gdb.Command):
     class Slot: pass
@@ -25,6 +60,8 @@ class Console:
         self.connect_handlers()
         
     def end(self) -> None:
+        # wake redirect logger thread first (e.g. "panel end" during "c&"), it blocks in select() without timeout
+        self.stop_redirect()
         self.reset_flags()
         self.disconnect_handlers()
 
@@ -36,10 +73,10 @@ class Console:
         else:
             self.objfile_build_time = None
         self.sal_outdated = False      # for source + stack pane
-        self.bps = []                  # for breakpoint pane
+        self.bps = {}                  # for breakpoint pane, keyed by breakpoint number in creation order
         self.bp_change = False         # for breakpoint pane
         self.history_count = 0         # for value history pane
-        self.refresh_watch_val = False # for watch pane
+        self.watch_gen = 0             # for watch pane, bumped whenever watched values may change
         self.logging = False           # for background logger thread
         self.inferior_running = False  # for background logger thread
 
@@ -48,12 +85,14 @@ class Console:
         gdb.events.cont.connect(self.running_handler)
         gdb.events.breakpoint_created.connect(self.breakpoint_created_handler)
         gdb.events.breakpoint_deleted.connect(self.breakpoint_deleted_handler)
+        gdb.events.new_objfile.connect(self.new_objfile_handler)
     
     def disconnect_handlers(self) -> None:
         gdb.events.stop.disconnect(self.stop_handler)
         gdb.events.cont.disconnect(self.running_handler)
         gdb.events.breakpoint_created.disconnect(self.breakpoint_created_handler)
         gdb.events.breakpoint_deleted.disconnect(self.breakpoint_deleted_handler)
+        gdb.events.new_objfile.disconnect(self.new_objfile_handler)
 
     def running_handler(self, event: gdb.ContinueEvent) -> None:
         if self.inferior_running:
@@ -62,13 +101,21 @@ class Console:
             return
         if self.logging:
             self.inferior_running = True
-            thread = threading.Thread(target=self.logger.redirect, args=[self])
-            thread.start()
+            self.redirect_done.clear()
+            self.redirect_go.set()
+
+    # wake redirect logger thread by its stop fd & wait until current redirect returns
+    def stop_redirect(self) -> None:
+        if self.inferior_running:
+            self.inferior_running = False
+            self.logger.stop()
+            # redirect returns on the stop fd at once, timeout only guards gdb from hanging
+            self.redirect_done.wait(timeout=1)
 
     def stop_handler(self, event: gdb.StopEvent) -> None:
-        self.inferior_running = False
+        self.stop_redirect()
         self.sal_outdated = True
-        self.refresh_watch_val = True
+        self.watch_gen += 1
         if isinstance(event, gdb.BreakpointEvent):
             self.bp_hit = True
 
@@ -77,17 +124,41 @@ class Console:
             # not watch point, source pane shows breakpoint's location
             self.bp_create = True
         self.bp_change = True
-        self.bps.append(bp)
+        self.bps[bp.number] = bp
 
     def breakpoint_deleted_handler(self, bp: gdb.Breakpoint) -> None:
-        self.bps.sort(key=lambda i: i == bp)
-        self.bps.pop()
+        self.bps.pop(bp.number, None)
         self.bp_change = True
 
+    def new_objfile_handler(self, event: gdb.NewObjFileEvent) -> None:
+        # symbols may be changed, drop cached function names of breakpoint pane
+        Panel.Breakpoints.short_function_name.cache_clear()
+        # target (thus its byte order) may be changed
+        Panel.Pane.target_byteorder.cache_clear()
+
 
 
     ''' ------------------------------------------ api for panel --------------------------------------------- '''
+    # gdb 14+ lists every frame in one MI command, older gdb walks frames through python
+    mi_frame_names = {'<function called from gdb>': '<Gdb Function Call>', '<signal handler called>': '<OS Signal Handler>'}
+
     def refresh_stack(self) -> list:
+        if hasattr(gdb, 'execute_mi'):
+            try:
+                frames = gdb.execute_mi('-stack-list-frames')['stack']
+            except gdb.error:
+                frames = None
+            if frames != None:
+                stack = []
+                for f in frames:
+                    func = f.get('func')
+                    if func in self.mi_frame_names:
+                        stack.append(self.mi_frame_names[func])
+                    elif 'file' in f:
+                        stack.append([int(f['level']), f['file'], int(f['line']), func])
+                    # else: no debug info, seems from libc.so
+                return stack
+
         stack = []
         f = gdb.newest_frame()
         while f:
@@ -113,11 +184,12 @@ class Console:
             return gdb.lookup_global_symbol(func, gdb.SYMBOL_VAR_DOMAIN).name
 
     def get_last_cmd_val(self) -> list:
-        cmd = gdb.execute('show commands', False, True).split('\n')
-        if len(cmd) < 2:
+        # only the last line is needed, take it without splitting the whole output
+        cmd = gdb.execute('show commands', False, True).rstrip('\n')
+        if not cmd:
             return 0, '', None
-        cmd = cmd[-2]
-        first = re.search(r'\s+\d+\s+', cmd).span()[1]
+        cmd = cmd.rpartition('\n')[2]
+        first = _CMD_PREFIX_RE.match(cmd).end()
         first_char = cmd[first]
         if first_char == 'f' or first_char == 't':
             self.sal_outdated = True
@@ -137,54 +209,63 @@ class Console:
 
         @staticmethod
         def create_fifo() -> str:
-            path = ''
-            while True:
-                time_stamp = str(time.time()).split('.')[1]
-                path = f'/tmp/gdb_{time_stamp}.log'
-                if not os.path.exists(path):
-                    os.mkfifo(path)
-                    break
-            return path
+            # mkfifo fails atomically on existing path, no need to probe first
+            pid = os.getpid()
+            for n in itertools.count():
+                path = f'/tmp/gdb_{pid}_{n}.log'
+                try:
+                    os.mkfifo(path, 0o600)
+                    return path
+                except FileExistsError:
+                    continue
 
         def __init__(self):
             self.path = self.create_fifo()
 
-            self.logs = ['~'] * 500
-            self.cursor = 0
+            # ring buffer, oldest lines are discarded by deque itself
+            self.logs = collections.deque(maxlen=LOG_CAPACITY)
 
             self.input_line = '(input) '
             self.input_prefix_len = 8
 
         def start(self):
-            self.fifo = open(self.path, opener=self.fifo_opener)
+            # inferior may write bytes that are not utf-8, never let decoding kill the redirect thread
+            self.fifo = open(self.path, errors='replace', opener=self.fifo_opener)
+            # redirect thread sleeps in select() without timeout, writing to this pipe wakes it up to exit
+            self.stop_r, self.stop_w = os.pipe()
+            os.set_blocking(self.stop_r, False)
+            os.set_blocking(self.stop_w, False)
             self.sel = selectors.DefaultSelector()
             self.sel.register(self.fifo, selectors.EVENT_READ)
+            self.sel.register(self.stop_r, selectors.EVENT_READ)
+
+        def stop(self) -> None:
+            os.write(self.stop_w, b'x')
 
         def end(self) -> None:
             self.sel.unregister(self.fifo)
+            self.sel.unregister(self.stop_r)
             self.sel.close()
             self.fifo.close()
+            os.close(self.stop_r)
+            os.close(self.stop_w)
 
-        def append(self, line: str) -> None:
-            self.logs[self.cursor] = line
-            if self.cursor == 499:
-                self.cursor = 0
-            else:
-                self.cursor += 1
-
-        def redirect(self, console: Console) -> None:
+        def redirect(self) -> None:
             print('\x1b[H\x1b[2J', file=sys.__stdout__)
             input_line = self.input_line
 
-            while True:
-                if not console.inferior_running:
-                    break
-
-                # although open the pipe in non_blocking mode, once inferior keep writing (no EOF?), "select()" still hangs, must set timeout
+            stopped = False
+            while not stopped:
+                # although open the pipe in non_blocking mode, once inferior keep writing (no EOF?), "select()" still hangs
                 #   "Any stdio output stream is by default line buffered if output is going to a terminal and block buffered (typically 4KB blocks) otherwise. \
                 #       See the manpages for stdio(3) and setbuf(3)."
                 #       refer to https://www.linuxquestions.org/questions/programming-9/c-printf-hangs-linux-pipes-4175428396/
-                for key, _ in self.sel.select(timeout=1):
+                #   instead of polling with timeout, select() also watches the stop fd written by Console.stop_redirect()
+                for key, _ in self.sel.select():
+                    if key.fileobj == self.stop_r:
+                        os.read(self.stop_r, 64)
+                        stopped = True
+                        continue
                     log = key.fileobj.read()
 
                     # all input handle behaviour based on txx on Alxxic's server
@@ -197,15 +278,14 @@ class Console:
                             input_line = input_line[:-1]
                         output = '\x1b[2K\r' + input_line
                     elif log[0] == '\n':    # handle "enter", record current input, print input + newline + input_prefix
-                        self.append(input_line)
+                        self.logs.append(input_line)
                         output = '\r' + input_line + '\n' + self.input_line
                         input_line = self.input_line
                     elif len(log) == 1:     # handle normal input
                         input_line += log
                         output = '\r' + input_line
                     else:
-                        for line in log.strip('\n').split('\n'):
-                            self.append(line.replace('\t', '    '))
+                        self.logs.extend(log.strip('\n').replace('\t', '    ').split('\n'))
                         output = log
                     print(output, file=sys.__stdout__, end='')
 
@@ -213,15 +293,12 @@ class Console:
             print('Trying to get inferior\'s log ...')
             read_success = False
             for key, _ in self.sel.select(timeout=1):
+                if key.fileobj == self.stop_r:
+                    continue
                 read_success = True
                 log = key.fileobj.read()
                 print(log, file=sys.__stdout__)
-                for line in log.split('\n'):
-                    self.logs[self.cursor] = line
-                    if self.cursor == 499:
-                        self.cursor = 0
-                    else:
-                        self.cursor += 1
+                self.logs.extend(log.replace('\t', '    ').split('\n'))
             if not read_success:
                 print('Failed to get new log.')
 
@@ -230,23 +307,51 @@ class Console:
         self.logging = True
         self.logger.start()
 
-    # only create fifo when "panel run" is called
+    # persistent logger thread, sleeps between inferior runs instead of being re-created for each
+    def redirect_loop(self) -> None:
+        while True:
+            self.redirect_go.wait()
+            self.redirect_go.clear()
+            if self.redirect_exit:
+                return
+            # redirect_done must be set whatever happens, stop handlers wait on it
+            try:
+                self.logger.redirect()
+            except Exception as e:
+                print(f'Panel logger error: {e}', file=sys.__stdout__)
+            finally:
+                self.redirect_done.set()
+
+    # only create fifo & logger thread when "panel run" is called
     def init_logger(self):
         self.logger = Console.Logger()
 
+        self.redirect_go = threading.Event()
+        self.redirect_done = threading.Event()
+        self.redirect_done.set()
+        self.redirect_exit = False
+        self.logger_thread = threading.Thread(target=self.redirect_loop, daemon=True)
+        self.logger_thread.start()
+
         # stop logging when current process stops
         def inf_exit_logger_handler(e: gdb.ExitedEvent):
             if self.logging:
                 # wait for logger redirect thread exit before close fifo
-                self.inferior_running = False
-                time.sleep(0.1)
+                self.stop_redirect()
 
                 self.logger.end()
                 self.logging = False
         gdb.events.exited.connect(inf_exit_logger_handler)
 
-        # remove fifo when current gdb session exit (may leak when gdb crash)
-        gdb.events.gdb_exiting.connect(lambda e: os.unlink(self.logger.path))
+        # end logger thread & remove fifo when current gdb session exit (may leak when gdb crash)
+        def gdb_exit_logger_handler(e: gdb.GdbExitingEvent):
+            self.stop_redirect()
+            self.redirect_exit = True
+            self.redirect_go.set()
+            # redirect may outlive stop_redirect()'s timeout (e.g. blocked on stdout), never hang gdb on quit
+            self.logger_thread.join(timeout=1)
+            os.unlink(self.logger.path)
+        gdb.events.gdb_exiting.connect(gdb_exit_logger_handler)
 
 
 console = Console()
@@ -299,26 +404,26 @@ class Panel(gdb.Command):
         'discard-scrollback-buffer': False
     }
 
-    @staticmethod
-    def check_layout_config(config: dict) -> None:
+    @classmethod
+    def check_layout_config(cls, config: dict) -> None:
         slots = config['slots']
         panes = config['panes']
         mapping = {}
 
-        if type(slots) != list:
+        if not isinstance(slots, list):
             raise Panel.PanelConfigError('Layout', 'slots config must be a list')
         for slot in slots:
             if slot == None:
                 continue
             mapping[slot[0]] = None
             for i in slot[1:]:
-                if type(i) != int or i <= 0 or i > 10:
+                if not isinstance(i, int) or i <= 0 or i > 10:
                     raise Panel.PanelConfigError('Layout', f'Invalid slot config {slot}, width/height must in range (0, 10]')
 
-        if type(panes) != dict:
+        if not isinstance(panes, dict):
             raise Panel.PanelConfigError('Layout', 'panes config must be a dict')
         for pane, slot_id in panes.items():
-            if pane not in Panel.__dict__:
+            if pane not in cls.Pane.registry:
                 raise Panel.PanelConfigError('Layout', f'pane {pane} not defined.')
             if slot_id not in mapping:
                 raise Panel.PanelConfigError('Layout', f'pane {pane} with invalid slot index {slot_id}.')
@@ -333,40 +438,54 @@ class Panel(gdb.Command):
     style = None
     class Style:
         def __init__(self, conf: dict):
+            # escape prefixes are encoded once here, wrappers below are plain concatenations
+            self.ansi_reset = '\x1b[m'
+            self.deli_prefix = self.ansi_color_prefix(conf['delimiter-color'])
+            self.bp_prefix = self.ansi_color_prefix(conf['breakpoint-color'])
+            self.bp_disabled_prefix = self.ansi_prefix(conf['disabled-breakpoint'])
+            self.filename_prefix = self.ansi_color_prefix(conf['filename-color'])
+            self.function_prefix = self.ansi_color_prefix(conf['function-color'])
+            self.abnormal_frame_prefix = self.ansi_color_prefix(conf['abnormal-frame-color'])
+
             # pane border lines
-            self.deli_h = self.borderline_repeater(conf['delimiter-color'], conf['delimiter-horizontal'])
-            self.deli_v = self.ansi_color_wrapper(conf['delimiter-color'], conf['delimiter-vertical']) + ' ' # space on right side
+            self.deli_h = self.borderline_repeater(self.deli_prefix, conf['delimiter-horizontal'])
+            self.deli_v = self.deli_prefix + conf['delimiter-vertical'] + self.ansi_reset + ' ' # space on right side
 
             # breakpoint
-            self.bp_hit = self.ansi_color_wrapper(conf['breakpoint-color'], conf['breakpoint-hit'])
-            self.bp_idle = self.ansi_color_wrapper(conf['breakpoint-color'], conf['breakpoint-idle'])
-            self.bp_disabled_wrapper = self.ansi_wrapper(conf['disabled-breakpoint'], '{}')
+            self.bp_hit = self.bp_prefix + conf['breakpoint-hit'] + self.ansi_reset
+            self.bp_idle = self.bp_prefix + conf['breakpoint-idle'] + self.ansi_reset
+            self.bp_disabled_wrapper = self.bp_disabled_prefix + '{}' + self.ansi_reset
+            self.bp_disabled_wrapper_parts = (self.bp_disabled_prefix, self.ansi_reset)
 
-            # for breakpoint & stack, source locations
-            self.filename_wrapper = self.ansi_color_wrapper(conf['filename-color'], '{}')
-            self.function_wrapper = self.ansi_color_wrapper(conf['function-color'], '{}')
+            # for breakpoint & stack, source locations, (prefix, suffix) as ANSIstr wrapping
+            self.filename_wrapper = (self.filename_prefix, self.ansi_reset)
+            self.function_wrapper = (self.function_prefix, self.ansi_reset)
 
             # for stack
-            self.abnormal_frame_wrapper = self.ansi_color_wrapper(conf['abnormal-frame-color'], '{}')
+            self.abnormal_frame_wrapper = (self.abnormal_frame_prefix, self.ansi_reset)
 
         @staticmethod
-        def ansi_wrapper(code: int, content: str) -> str:
-            return f'\x1b[{code}m{content}\x1b[m'
+        def ansi_prefix(code: int) -> str:
+            return f'\x1b[{code}m'
 
         @staticmethod
-        def ansi_color_wrapper(code: int, content: str) -> str:
-            return f'\x1b[38;5;{code}m{content}\x1b[m'
+        def ansi_color_prefix(code: int) -> str:
+            return f'\x1b[38;5;{code}m'
 
         @staticmethod
-        def borderline_repeater(code: int, content: str) -> Callable[[int], str]:
-            color_str = f'\x1b[38;5;{code}m'
+        def borderline_repeater(color_str: str, content: str) -> Callable[[int], str]:
+            # only a few distinct widths (one per slot), cache lives with Panel.style and is rebuilt on config reload
+            @functools.lru_cache(maxsize=64)
             def repeater(times: int) -> str:
                 return color_str + (content * times) + '\x1b[m'
             return repeater
 
+        # same few source paths recur across frames & breakpoints, and never change within a session
         @staticmethod
+        @functools.lru_cache(maxsize=256)
         def strip_filename(filename: str) -> str:
-            return '/'.join(filename.split('/')[-2:])
+            # split from right at most twice instead of into every path component
+            return '/'.join(filename.rsplit('/', 2)[-2:])
 
 
     def load_config(self) -> None:
@@ -392,17 +511,12 @@ class Panel(gdb.Command):
         self.render_once = False
         self.skip_render_once = False
         self.layout_valid = False
+        self.size_checked = -1.0
 
     def start(self) -> None:
         self.enabled = True
         sys.excepthook = self.excepthook
-        self.panes = {}
-        for name, obj in Panel.__dict__.items():
-            try:
-                if name != 'Pane' and issubclass(obj, Panel.Pane):
-                    self.panes[name] = obj()
-            except TypeError:
-                pass
+        self.panes = {name: pane() for name, pane in Panel.Pane.registry.items()}
         self.load_config()
         gdb.execute('set logging file /dev/null')
         gdb.execute('set logging redirect on')
@@ -437,12 +551,13 @@ class Panel(gdb.Command):
             
             content = self.pane.render(self.width, self.height, self.padding)
 
+            deli_v = Panel.style.deli_v
             top_right = False   # indicate whether lines in below_content should concate with extra lines from right_content
             if self.right != None:
                 right_content = self.right.render()
                 top_right = len(right_content) > len(content)
                 for i in range(len(content)):
-                    right_content[i] = content[i] + Panel.style.deli_v + right_content[i]
+                    right_content[i] = ''.join((content[i], deli_v, right_content[i]))
                 content = right_content
 
             if self.below != None:
@@ -453,9 +568,9 @@ class Panel(gdb.Command):
                     content += below_content    # content already aligned
                 else:
                     end = (self.below.height * -1) - 1
-                    content[end] = Panel.style.deli_h(self.below.width) + Panel.style.deli_v + content[end]
+                    content[end] = ''.join((Panel.style.deli_h(self.below.width), deli_v, content[end]))
                     for i in range(-1, end, -1):
-                        content[i] = below_content[i] + Panel.style.deli_v + content[i]
+                        content[i] = ''.join((below_content[i], deli_v, content[i]))
             
             return content
 
@@ -467,24 +582,24 @@ class Panel(gdb.Command):
 
         def add(self, left: int, right: int, val: int) -> None:
             new_ranges = []
+            append = new_ranges.append
             for R in self.ranges:
-                if R[0] >= right or R[1] <= left:
-                    new_ranges.append(R)
-                    continue
-
                 l, r, v = R
+                if l >= right or r <= left:
+                    append(R)
+                    continue
 
                 # R is wider on left side, remain origin value
                 if l < left:
-                    new_ranges.append([l, left, v])
+                    append([l, left, v])
 
                 # intersect part of newly added range and current R
                 # keep newly added range never has left < R.l
-                new_ranges.append([left, min(r, right), v + val])
+                append([left, r if r < right else right, v + val])
 
                 # R is wider on right side, remain origin value
                 if r > right:
-                    new_ranges.append([right, r, v])
+                    append([right, r, v])
 
                 # newly added range has un-merge value
                 if r < right:
@@ -496,11 +611,14 @@ class Panel(gdb.Command):
         def __init__(self, config: list, width: int, height: int):
             self.slots = {}
             slot_bounds = {}
+            next_idx = 0    # walk config by index, it is not copied nor consumed
             def build_tree(xl: int, yt: int) -> Panel.Slot:
+                nonlocal next_idx
                 try:
-                    slot_config = config.pop(0)
+                    slot_config = config[next_idx]
                 except IndexError:
                     raise Panel.PanelConfigError('Layout', 'Invalid "slots", missing element (probably None)')
+                next_idx += 1
                 if slot_config == None:
                     return None
                 else:
@@ -547,26 +665,34 @@ class Panel(gdb.Command):
                     raise Panel.PanelConfigError('Layout', f'width range (starts from terminal left) [{l}, {r}] with height {v}')
 
         # ensure slots still align after ceil
+        #   coords are ints in [0, 10], so tables are indexed directly by coord
         @staticmethod
-        def get_real_coords(bounds: dict[int, list[int]], unit_w: float, unit_h: float) -> list[dict[int]]:
-            coords = [bound for i, bound in bounds.items()]
-            values = [i for i in zip(*coords)]
-            xs = set(values[0] + values[1])
-            ys = set(values[2] + values[3])
-
-            def get_reals(coords: set, unit: float) -> dict[int, int]:
-                coords = sorted(list(coords))
-                reals = {0: 0}
-                for i in range(1, len(coords) - 1):
-                    ofsa = coords[i - 1]
-                    ofsb = coords[i]
-                    reals[ofsb] = reals[ofsa] + math.ceil((ofsb - ofsa) * unit)
+        def get_real_coords(bounds: dict[int, list[int]], unit_w: float, unit_h: float) -> tuple[list[int], list[int]]:
+            seen_x = [False] * 11
+            seen_y = [False] * 11
+            for xl, xr, yt, yb in bounds.values():
+                seen_x[xl] = seen_x[xr] = True
+                seen_y[yt] = seen_y[yb] = True
+
+            # coord 10 is left for caller
+            def get_reals(seen: list[bool], unit: float) -> list[int]:
+                reals = [0] * 11
+                prev = 0
+                for i in range(1, 10):
+                    if seen[i]:
+                        reals[i] = reals[prev] + math.ceil((i - prev) * unit)
+                        prev = i
                 return reals
-            
-            return get_reals(xs, unit_w), get_reals(ys, unit_h)
+
+            return get_reals(seen_x, unit_w), get_reals(seen_y, unit_h)
 
 
     def refresh_layout(self, new_config: dict = None) -> None:
+        # terminal size rarely changes within a burst of prompts (e.g. holding "n"), query it at most every 100ms
+        now = time.monotonic()
+        if new_config == None and now - self.size_checked < 0.1:
+            return
+        self.size_checked = now
         termw, termh = os.get_terminal_size()
         if new_config == None and termw == self.width and termh == self.height + 2:
             return
@@ -579,7 +705,7 @@ class Panel(gdb.Command):
             self.current_layout_config = new_config
 
         slots_config = self.current_layout_config['slots']
-        self.layout = Panel.Layout(copy.deepcopy(slots_config), self.width, self.height)
+        self.layout = Panel.Layout(slots_config, self.width, self.height)
         self.layout_valid = True
 
         panes_config = self.current_layout_config['panes']
@@ -691,7 +817,7 @@ class Panel(gdb.Command):
             except TypeError:
                 raise Panel.PanelSyntaxError(arg, argv[0])
             self.panes['Watch'].expressions.append(expression)
-            console.refresh_watch_val = True
+            console.watch_gen += 1
 
         # delete EXPRESSION from panel's watch list
         elif argv[0] == 'unwatch':
@@ -702,6 +828,7 @@ class Panel(gdb.Command):
             if idx >= len(self.panes['Watch'].expressions):
                 raise Panel.PanelError(f'{idx} out of watch list range.')
             self.panes['Watch'].expressions.pop(idx)
+            console.watch_gen += 1
 
         # try flush inferior process's output stream buffer & read new logs
         elif argv[0] == 'flush':
@@ -716,12 +843,12 @@ class Panel(gdb.Command):
 
     @staticmethod
     def format_args(types: list[type], args: list[str]) -> list:
+        body = args[1:]  # skip sub-command, caller passes whole argv
+        if len(body) < len(types):
+            return None
         try:
-            legal = []
-            for i in range(len(types)):
-                legal.append(types[i](args[i + 1]))  # +1 for avoid exception raise in caller, pass whole argv
-            return legal
-        except (IndexError, ValueError):
+            return [t(a) for t, a in zip(types, body)]
+        except ValueError:
             return None
 
     @staticmethod
@@ -732,9 +859,22 @@ class Panel(gdb.Command):
         if dsc:
             print('\x1b[3J', file=sys.__stdout__)
 
-    @staticmethod
-    def set_discard_gdb(dsc: bool = False):
+    # last value passed to "set logging enabled", a gdb command round-trip is skipped when unchanged
+    discard_gdb_state = None
+    @classmethod
+    def set_discard_gdb(cls, dsc: bool = False):
+        if dsc == cls.discard_gdb_state:
+            return
         gdb.execute('set logging enabled {}'.format('on' if dsc else 'off'), False, True)
+        # only record a state gdb actually reached
+        cls.discard_gdb_state = dsc
+
+    @staticmethod
+    def input_pending() -> bool:
+        try:
+            return sys.stdin.isatty() and bool(select.select([sys.stdin], [], [], 0)[0])
+        except (OSError, ValueError):
+            return False
 
     def render_handler(self) -> None:
         global console
@@ -761,11 +901,15 @@ class Panel(gdb.Command):
                 self.skip_render_once = False
                 return True
 
+        # one-shot flags above are consumed first, whether or not the render is skipped by pending input
         if not skip_render():
+            # user is typing ahead (e.g. holding "n"), the pending command will stop & render again soon
+            #   keep the refresh flags so the render of the last command picks up every skipped stop
+            if self.input_pending():
+                return
             self.render()
 
         console.sal_outdated = False
-        console.refresh_watch_val = False
 
 
 
@@ -820,39 +964,64 @@ class Panel(gdb.Command):
     ''' ------------------------------------------ panes --------------------------------------------- '''
     class ANSIstr:
         def __init__(self, encoded: str = None):
-            self.seq = [] # elem: [len_of_raw_substr, raw_str, wrapping_str]
+            # segments in parallel arrays
+            self.raw_lens = array.array('i')  # length of raw str up to & including each segment, non-decreasing
+            self.raws = []                      # raw str
+            self.wraps = []                     # (wrapping_prefix, wrapping_suffix) or None
             self.fix = [] # elem: [prefix, suffix]
             if encoded != None:
                 self.decode(encoded)
 
+        # segments: (raw_len, raw, wrap), filled into the arrays at once
+        @classmethod
+        def from_segments(cls, segments) -> Panel.ANSIstr:
+            line = cls()
+            raw_lens, raws, wraps = zip(*segments)
+            line.raw_lens.extend(raw_lens)
+            line.raws = list(raws)
+            line.wraps = list(wraps)
+            return line
+
+        def append(self, raw_len: int, raw: str, wrap: tuple[str, str] = None) -> None:
+            self.raw_lens.append(raw_len)
+            self.raws.append(raw)
+            self.wraps.append(wrap)
+
         def style_underline(self) -> None:
-            self.fix.append(['\x1b[4m', '\x1b[m'])
+            underline = ['\x1b[4m', '\x1b[m']
+            if underline not in self.fix:
+                self.fix.append(underline)
 
         def decode(self, encoded: str) -> None:
+            # plain line (blank, or no highlighted token), skip the regex engine
+            if '\x1b' not in encoded:
+                self.append(len(encoded), encoded)
+                return
+
             raw_len = 0
             prev_end = 0 # idx next to previous match substr
-            for m in re.finditer(r'\x1b\[38.+?m(.+?)\x1b\[39.*?m', encoded):
+            for m in _ANSI_RE.finditer(encoded):
                 first, end = m.span()
                 if first != prev_end:
                     # has pure str
                     raw_len += (first - prev_end)
-                    self.seq.append([raw_len, encoded[prev_end:first], None])
+                    self.append(raw_len, encoded[prev_end:first])
 
                 wrapping_pre = encoded[first:m.start(1)]
                 raw_str = encoded[m.start(1):m.end(1)]
                 wrapping_suf = encoded[m.end(1):end]
                 raw_len += len(raw_str)
-                self.seq.append([raw_len, raw_str, f'{wrapping_pre}{{}}{wrapping_suf}'])
+                self.append(raw_len, raw_str, (wrapping_pre, wrapping_suf))
 
                 prev_end = end
 
             if prev_end != len(encoded):
                 raw_str = encoded[prev_end:]
                 raw_len += len(raw_str)
-                self.seq.append([raw_len, raw_str, None])
+                self.append(raw_len, raw_str)
 
         def match(self, width: int, padding: bool) -> str:
-            diff = width - self.seq[-1][0]
+            diff = width - (self.raw_lens[-1] if self.raw_lens else 0)
             if diff < 0:
                 line = self.truncate(width)
             elif diff > 0 and padding:
@@ -869,70 +1038,93 @@ class Panel(gdb.Command):
             return line
         
         def truncate(self, length: int) -> str:
-            for i in range(len(self.seq)):
-                if self.seq[i][0] >= length:
-                    break
-            last = self.seq[i]
-            offset = length - (last[0] - len(last[1]))
-            new_raw = last[1][:offset]
-            seq = self.seq[:i]
-            seq.append([length, new_raw, last[2]])
-
-            return self.printf(seq)
+            # first segment reaching length, raw_lens is sorted
+            i = bisect.bisect_left(self.raw_lens, length)
+            if i == len(self.raws):
+                # whole str already fits (also covers no segment at all)
+                return self.printf()
+            raw = self.raws[i]
+            new_raw = raw[:length - (self.raw_lens[i] - len(raw))]
+            wrap = self.wraps[i]
+
+            return self.printf(i) + (new_raw if wrap == None else wrap[0] + new_raw + wrap[1])
         
-        def printf(self, seq: list = None) -> str:
-            if not seq:
-                seq = self.seq
-            
-            line = ''
-            for i in seq:
-                if not i[2]:
-                    line += i[1]
-                else:
-                    line += i[2].format(i[1])
-            
-            return line
+        # join first "count" segments, all if not specified
+        def printf(self, count: int = None) -> str:
+            raws = self.raws if count == None else self.raws[:count]
+            return ''.join([raw if wrap == None else wrap[0] + raw + wrap[1] for raw, wrap in zip(raws, self.wraps)])
 
 
     class Pane:
+        # every subclass registers itself by class name, which is also the pane name used in config
+        registry = {}
+        def __init_subclass__(cls, **kwargs):
+            super().__init_subclass__(**kwargs)
+            cls.registry[cls.__name__] = cls
+
         @staticmethod
         def match_pure_str(line: str, width: int, padding: bool) -> str:
-            diff = width - len(line)
-            if diff < 0:
-                return line[:width]
-            elif diff > 0 and padding:
-                return line + ' ' * diff
-            else:
-                return line
+            if padding:
+                return line[:width].ljust(width)
+            return line if len(line) <= width else line[:width]
+
+        # pane only shows the count, stop walking beyond it
+        list_size_limit = 999
+
+        # a gdb command round-trip, only queried once until a new objfile is loaded
+        @staticmethod
+        @functools.lru_cache(maxsize=1)
+        def target_byteorder() -> str:
+            return 'little' if 'little' in gdb.execute('show endian', False, True) else 'big'
 
+        # _M_next is the first member of a list node, read it as raw pointer instead of subscripting gdb.Value per node
+        #   returns at most list_size_limit + 1
         @staticmethod
         def ListSizeWorker_call_(list_obj: gdb.Value) -> int:
-            begin_node = list_obj['_M_impl']['_M_node']['_M_next']
-            end_node = list_obj['_M_impl']['_M_node'].address
+            head = list_obj['_M_impl']['_M_node']
+            end_addr = int(head.address)
+            addr = int(head['_M_next'])
+            ptr_size = head['_M_next'].type.sizeof
+            byteorder = Panel.Pane.target_byteorder()
+            read_memory = gdb.selected_inferior().read_memory
+            limit = Panel.Pane.list_size_limit
             size = 0
-            while begin_node != end_node:
-                begin_node = begin_node['_M_next']
+            while addr != end_addr and size <= limit:
+                addr = int.from_bytes(read_memory(addr, ptr_size), byteorder)
                 size += 1
             return size
 
         @staticmethod
-        def shrink_value_string(v: gdb.Value) -> list[str]:
+        def shrink_value_string(v: gdb.Value, fstr: str = None) -> list[str]:
             head = '    '
-            fstr = v.format_string()
+            if fstr == None:
+                fstr = v.format_string()
             if '\n' not in fstr:
                 return [head + fstr]
             else:
-                lines = fstr.strip().split('\n')
-                try:
-                    typetag = v.type.target().strip_typedefs().tag
-                except RuntimeError:
-                    typetag = ''
-                if re.match('^std::(__\d+::)?(__cxx11::)?list<.*>$', typetag) != None:
-                    size = Panel.Pane.ListSizeWorker_call_(v)
-                    rep = ' with {} element{} :'.format(size, 's' if size > 1 else '')
-                else:
+                # only the first 4 lines are shown
+                lines = fstr.strip().split('\n', 4)
+                first = lines[0]
+                if ' = {' in first:
+                    # type is only looked up when there is a " = {" to replace
+                    try:
+                        typetag = v.type.target().strip_typedefs().tag
+                    except RuntimeError:
+                        typetag = ''
                     rep = ' :'
-                sstr = [head + lines[0].replace(' = {', rep)]
+                    if typetag and _LIST_TAG_RE.match(typetag) != None:
+                        # ValueHistory shrinks values when displayed, count reflects memory at display time
+                        #   list may be freed or changed since printed (pane hidden while inferior ran), count is dropped then
+                        try:
+                            size = Panel.Pane.ListSizeWorker_call_(v)
+                        except gdb.error:
+                            size = None
+                        if size != None:
+                            limit = Panel.Pane.list_size_limit
+                            count = f'{limit}+' if size > limit else size
+                            rep = ' with {} element{} :'.format(count, 's' if size > 1 else '')
+                    first = first.replace(' = {', rep)
+                sstr = [head + first]
 
                 for line in lines[1:4]:
                     if line != '}':
@@ -945,16 +1137,10 @@ class Panel(gdb.Command):
 
         def render(self, width: int, height: int, padding: bool) -> list[str]:
             raw = self.refresh_content(height)
-            # height passed to subclass only for hint, ensure dimension here
-            if len(raw) > height:
-                raw = raw[:height]
-
-            content = []
-            for line in raw:
-                if isinstance(line, Panel.ANSIstr):
-                    content.append(line.match(width, padding))
-                else:
-                    content.append(Panel.Pane.match_pure_str(line, width, padding))
+            # height passed to subclass only for hint, ensure dimension here without copying raw
+            match_pure_str = Panel.Pane.match_pure_str
+            content = [line.match(width, padding) if isinstance(line, Panel.ANSIstr) else match_pure_str(line, width, padding)
+                       for line in itertools.islice(raw, height)]
 
             diff = height - len(content)
             if diff > 0:
@@ -971,24 +1157,26 @@ class Panel(gdb.Command):
             self.file = None
             self.cache = {}
             self.highlighted = {}
+            self.plain = {}     # low performance mode, unhighlighted lines of each cached file
+            self.mtimes = {}    # modification time of each cached file when it was read
 
-            from pygments.formatters import Terminal256Formatter
-            self.fmter = Terminal256Formatter(style=Panel.config['style']['source-highlight-style'])
-
-            from pygments.lexers import get_lexer_for_filename
-            self.lexer = get_lexer_for_filename('foo.cpp')
+            self.style = Panel.config['style']['source-highlight-style']
 
             self.low_performance = 'low-performance' in Panel.config
 
             self.warning = None
 
+            # inputs & output of previous refresh, reused when nothing changed (e.g. repeated "panel")
+            self.last_key = None
+            self.last_content = None
+
 
         def get_file_line(self) -> list:
             filename = center_idx = None
             global console
             if console.bp_create:
                 console.bp_create = False
-                loc = console.bps[-1].locations[0]
+                loc = next(reversed(console.bps.values())).locations[0]
                 filename = loc.fullname
                 center_idx = loc.source[1] - 1
             else:
@@ -1011,9 +1199,18 @@ class Panel(gdb.Command):
             if file == None:
                 return ['No source file/line found in current frame.']
 
+            # frame moved, re-read source only if it has been modified since cached
+            if console.sal_outdated and file in self.cache and self.source_modified(file):
+                del self.cache[file]
+
             if (file not in self.cache) and (not self.cache_file(file)):
                 return [f'Cannot open file: {file}.']
 
+            key = (file, center, height, bool(self.warning))
+            if key == self.last_key and not console.sal_outdated:
+                self.cache[file][center].style_underline()  # consumed by previous render
+                return self.last_content
+
             if self.warning:
                 height -= 1
 
@@ -1026,42 +1223,57 @@ class Panel(gdb.Command):
             content = self.cache[file][first:last]
 
             if self.warning:
-                content = [self.warning] + content
+                content.insert(0, self.warning)     # in place, content is already a fresh slice
                 self.warning = None
 
+            self.last_key = key
+            self.last_content = content
             return content
 
 
+        def source_modified(self, filename: str) -> bool:
+            try:
+                return os.path.getmtime(filename) != self.mtimes[filename]
+            except OSError:
+                return False
+
         def cache_file(self, filename: str) -> bool:
             try:
-                if console.objfile_build_time:
-                    edit_time = os.path.getmtime(filename)
-                    if edit_time > console.objfile_build_time:
-                        self.warning = f'Warning: source file {filename} edited after build.\n'
+                edit_time = os.path.getmtime(filename)
+                if console.objfile_build_time and edit_time > console.objfile_build_time:
+                    self.warning = f'Warning: source file {filename} edited after build.\n'
 
                 with open(filename, 'r') as f:
-                    source = f.read()
+                    source = f.read().expandtabs(4)  # one pass over the whole file instead of per line
             except IOError:
                 return False
+            self.mtimes[filename] = edit_time
 
             if self.low_performance:
-                self.cache[filename] = source.strip().split('\n')
+                self.plain[filename] = source.strip().split('\n')
+                self.cache[filename] = list(self.plain[filename])
                 self.highlighted[filename] = set()
                 return True
 
-            source = pygments.highlight(source, self.lexer, self.fmter).strip().split('\n')
+            lexer = _get_lexer_for(os.path.splitext(filename)[1])
+            source = pygments.highlight(source, lexer, _get_fmter(self.style)).strip().split('\n')
             lines = []
             for idx in range(len(source)):
-                source_line = source[idx].replace('\t', '    ')
-                lines.append(Panel.ANSIstr(encoded=f'{idx + 1:>5} {source_line}'))
+                lines.append(Panel.ANSIstr(encoded=f'{idx + 1:>5} {source[idx]}'))
             self.cache[filename] = lines
 
             return True
 
 
+        # low performance mode, highlight blocks of 500 lines covering [first, last) on demand
+        #   lexer restarts on every call, a few preceding lines are also fed to settle its state (e.g. inside a block comment)
+        segment_size = 500
+        segment_lookback = 10
+
         def highlight_segments(self, filename: str, first: int, last: int) -> None:
-            first = first // 100
-            last = (last - 1) // 100
+            size = self.segment_size
+            first = first // size
+            last = (last - 1) // size
             segment = []
             for i in range(first, last + 1):
                 if i in self.highlighted[filename]:
@@ -1072,17 +1284,18 @@ class Panel(gdb.Command):
                 return
 
             cache = self.cache[filename]
-            first = segment[0] * 100
-            last = min(len(cache), segment[-1] * 100 + 100)
-            source = pygments.highlight('\n'.join(cache[first:last]), self.lexer, self.fmter).split('\n')
+            first = segment[0] * size
+            last = min(len(cache), segment[-1] * size + size)
+            lookback = max(0, first - self.segment_lookback)
+            lexer = _get_lexer_for(os.path.splitext(filename)[1])
+            source = pygments.highlight('\n'.join(self.plain[filename][lookback:last]), lexer, _get_fmter(self.style)).split('\n')
             for idx in range(first, last):
-                source_line = source[idx - first].replace('\t', '    ')
-                cache[idx] = Panel.ANSIstr(encoded=f'{idx + 1:>5} {source_line}')
+                cache[idx] = Panel.ANSIstr(encoded=f'{idx + 1:>5} {source[idx - lookback]}')
 
 
     class Breakpoints(Pane):
         def __init__(self):
-            self.bp_lines = {} # ANSIstr or str
+            self.bp_lines = {} # breakpoint number: ANSIstr or str
 
         def update_bps(self) -> None:
             global console
@@ -1090,12 +1303,12 @@ class Panel(gdb.Command):
                 return
             console.bp_change = False
 
-            for bp in list(self.bp_lines.keys()):
-                if bp not in console.bps:
-                    del self.bp_lines[bp]
+            for number in list(self.bp_lines.keys()):
+                if number not in console.bps:
+                    del self.bp_lines[number]
 
-            for bp in console.bps:
-                if bp not in self.bp_lines:
+            for number, bp in console.bps.items():
+                if number not in self.bp_lines:
                     self.init_bp_line(bp)
 
         def init_bp_line(self, bp: gdb.Breakpoint) -> None:
@@ -1105,7 +1318,7 @@ class Panel(gdb.Command):
             else:
                 # break point
                 line = self.init_break_line(bp)
-            self.bp_lines[bp] = line
+            self.bp_lines[bp.number] = line
 
         @staticmethod
         def update_bp_line(bp: gdb.Breakpoint, line: Union[Panel.ANSIstr, str]) -> Union[Panel.ANSIstr, str]:
@@ -1118,8 +1331,8 @@ class Panel(gdb.Command):
             else:
                 # ANSIstr
                 if not bp.enabled:
-                    line.fix.append(Panel.style.bp_disabled_wrapper.split('{}'))
-                line.seq[-1][1] = f'hit {bp.hit_count:>2} times'
+                    line.fix.append(Panel.style.bp_disabled_wrapper_parts)
+                line.raws[-1] = f'hit {bp.hit_count:>2} times'
                 return line
                 
 
@@ -1127,66 +1340,68 @@ class Panel(gdb.Command):
             self.update_bps()
 
             content = []
-            for bp, line in self.bp_lines.items():
+            for number, line in self.bp_lines.items():
                 # for existing bp, update hit counts
-                content.append(self.update_bp_line(bp, line))
+                content.append(self.update_bp_line(console.bps[number], line))
 
             return content
             
-        def init_break_line(self, bp: gdb.Breakpoint) -> Panel.ANSIstr:
-            line = Panel.ANSIstr()
-
-            raw_len = 10
-            line.seq.append([raw_len, f'{bp.number:>3} break ', None])
+        # same function tends to appear at many breakpoint locations, symbol lookup is expensive
+        @staticmethod
+        @functools.lru_cache(maxsize=1024)
+        def short_function_name(function: str) -> str:
+            return Console.lookup_function_name(function).split('(')[0]
 
+        def init_break_line(self, bp: gdb.Breakpoint) -> Panel.ANSIstr:
             loc = bp.locations[0]
             filename, line_num = loc.source
-            # source
-            filename = Panel.Style.strip_filename(filename)
-            raw_len += len(filename)
-            line.seq.append([raw_len, filename, Panel.style.filename_wrapper])
-            # line number
-            line_num = f':{line_num} '
-            raw_len += len(line_num)
-            line.seq.append([raw_len, line_num, None])
-
-            # function
-            raw_len += 3
-            line.seq.append([raw_len, 'in ', None])
-            function = Console.lookup_function_name(loc.function).split('(')[0]
-            raw_len += len(function)
-            line.seq.append([raw_len, function, Panel.style.function_wrapper])
-            raw_len += 3
-            line.seq.append([raw_len, '() ', None])
-
+            # (raw, wrap, width)
+            parts = [
+                (f'{bp.number:>3} break ', None, 10),
+                (Panel.Style.strip_filename(filename), Panel.style.filename_wrapper, None),  # source
+                (f':{line_num} ', None, None),                                               # line number
+                ('in ', None, None),                                                         # function
+                (self.short_function_name(loc.function), Panel.style.function_wrapper, None),
+                ('() ', None, None)
+            ]
             # condition
             if bp.condition:
-                raw_len += (len(bp.condition) + 6)
-                line.seq.append([raw_len, f'[if {bp.condition}] ', None])
-            
+                parts.append((f'[if {bp.condition}] ', None, None))
             # preserve 12 width for hit count
-            line.seq.append([raw_len + 12, None, None])
+            parts.append((None, None, 12))
 
-            return line
+            widths = (len(raw) if width == None else width for raw, _, width in parts)
+            return Panel.ANSIstr.from_segments(
+                (raw_len, raw, wrap) for raw_len, (raw, wrap, _) in zip(itertools.accumulate(widths), parts))
 
 
     class Watch(Pane):
         def __init__(self):
             self.expressions = []
             self.content = []
+            self.evaluated = 0  # expressions before this index are already in content
+            self.gen = -1       # console.watch_gen when content was started, hidden pane may miss several
 
         def refresh_content(self, height: int) -> list[str]:
             global console
-            if console.refresh_watch_val:
+            # never extend content evaluated before a stop or a watch list change
+            if self.gen != console.watch_gen:
+                self.gen = console.watch_gen
                 self.content = []
-                for i in range(len(self.expressions)):
-                    e = self.expressions[i]
-                    self.content.append(f'{i:<3} {e} :')
-                    try:
-                        v = gdb.parse_and_eval(e)
-                        self.content += self.shrink_value_string(v)
-                    except gdb.error:
-                        self.content.append(f'    No symbol "{e}" in current context.')
+                self.evaluated = 0
+
+            # evaluate lazily, only as many expressions as the pane can show
+            #   the rest is evaluated later if pane grows before next refresh
+            while len(self.content) < height and self.evaluated < len(self.expressions):
+                i = self.evaluated
+                e = self.expressions[i]
+                self.content.append(f'{i:<3} {e} :')
+                try:
+                    v = gdb.parse_and_eval(e)
+                    self.content += self.shrink_value_string(v)
+                except gdb.error:
+                    self.content.append(f'    No symbol "{e}" in current context.')
+                self.evaluated += 1
 
             return self.content[:height]
 
@@ -1197,35 +1412,31 @@ class Panel(gdb.Command):
             # mix commands & values, since value may have multiple lines
             #   value stores formatted string, since temp value return from function (e.g. std::string) will corrupt after a few commands
             #   encounter this problem with gdb13.1 debugging txx on Axxic's server, therefore access in time
-            self.cnv = []
+            #   bounded, oldest lines are dropped in long sessions
+            self.cnv = collections.deque(maxlen=2048)
+            # (idx, cmd, value, formatted value) recorded but not shown yet, shrunk when pane is rendered
+            #   every value takes at least 2 lines of cnv, older entries would be dropped anyway
+            self.pending = collections.deque(maxlen=1024)
 
         @staticmethod
         def is_print_cmd(cmd: str) -> bool:
-            cmd_filter = [
-                # length, pattern
-                [2, 'p '],
-                [3, 'pp '],
-                [6, 'print '],
-                [12, 'panel print ']
-            ]
-            for length, pattern in cmd_filter:
-                if cmd[:length] == pattern:
-                    return True
-            return False
+            return cmd.startswith(_PRINT_PREFIXES)
 
         def record_cmd_value(self, idx: int, cmd: str, value: gdb.Value) -> None:
             if not self.is_print_cmd(cmd) or value == None:
                 return
 
-            self.cnv.append(f'{idx:<3} {cmd}')
-            self.cnv += self.shrink_value_string(value)
+            # format in time, but defer walking the list for its size until displayed
+            self.pending.append((idx, cmd, value, value.format_string()))
 
         def refresh_content(self, height: int) -> list[str]:
-            first = len(self.cnv) - height
-            if first > 0:
-                return self.cnv[first:]
-            else:
-                return self.cnv
+            while self.pending:
+                idx, cmd, value, fstr = self.pending.popleft()
+                self.cnv.append(f'{idx:<3} {cmd}')
+                self.cnv.extend(self.shrink_value_string(value, fstr))
+
+            size = len(self.cnv)
+            return list(itertools.islice(self.cnv, max(0, size - height), size))
 
 
 
@@ -1242,19 +1453,19 @@ class Panel(gdb.Command):
                     line = Panel.ANSIstr()
 
                     if isinstance(f, str):
-                        line.seq.append([len(f), f, Panel.style.abnormal_frame_wrapper])
+                        line.append(len(f), f, Panel.style.abnormal_frame_wrapper)
                     else:
                         level, filename, line_num, function = f
                         raw_len = 3
-                        line.seq.append([raw_len, f'{level:>2} ', None])
+                        line.append(raw_len, f'{level:>2} ')
                         filename = Panel.Style.strip_filename(filename)
                         raw_len += len(filename)
-                        line.seq.append([raw_len, filename, Panel.style.filename_wrapper])
+                        line.append(raw_len, filename, Panel.style.filename_wrapper)
                         line_part = f':{line_num} in '
                         raw_len += len(line_part)
-                        line.seq.append([raw_len, line_part, None])
+                        line.append(raw_len, line_part)
                         raw_len += len(function)
-                        line.seq.append([raw_len, function, Panel.style.function_wrapper])
+                        line.append(raw_len, function, Panel.style.function_wrapper)
 
                     self.content.append(line)
             
@@ -1266,20 +1477,8 @@ class Panel(gdb.Command):
             global console
             if not console.logging:
                 return ['Panel logger is not enabled.']
-            cursor = console.logger.cursor
             logs = console.logger.logs
-
-            first = cursor - height
-            if logs[first] == '~':
-                first = 0
-            if first == cursor:
-                content = []
-            elif first < 0:
-                content = logs[first:] + logs[:cursor]
-            else:
-                content = logs[first:cursor]
-            
-            return content
+            return list(itertools.islice(logs, max(0, len(logs) - height), len(logs)))
 
 
     class Threads(Pane):